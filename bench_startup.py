@@ -0,0 +1,106 @@
+"""
+Startup benchmark for the brawler-rater CLI.
+
+Runs each command in a fresh interpreter several times and reports the
+median wall time next to a bare `python -c pass`, then lists the
+slowest imports for `--help` and `build` from `python -X importtime`.
+
+`build` is a real build of a small catalog (BUILD_IMAGES images copied
+from the repo's image folder) in a temporary directory, with a warm
+header index, so it measures startup plus a minimal amount of work.
+
+    python bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, "brawler_rater.py")
+IMAGE_DIR = "brawler_images_default"
+BUILD_IMAGES = 5
+
+COMMANDS = {
+    "python -c pass": [sys.executable, "-c", "pass"],
+    "--help": [sys.executable, CLI, "--help"],
+    "scrape --help": [sys.executable, CLI, "scrape", "--help"],
+    "build --help": [sys.executable, CLI, "build", "--help"],
+    "serve --help": [sys.executable, CLI, "serve", "--help"],
+}
+BUILD = [sys.executable, CLI, "build"]
+
+
+def make_build_dir(root: str) -> str:
+    """
+    Create a tiny catalog in root for the build benchmark and return root.
+    """
+    src_dir = os.path.join(HERE, IMAGE_DIR)
+    dst_dir = os.path.join(root, IMAGE_DIR)
+    os.makedirs(dst_dir)
+    for fname in sorted(os.listdir(src_dir))[:BUILD_IMAGES]:
+        shutil.copy2(os.path.join(src_dir, fname), dst_dir)
+    return root
+
+
+def time_command(cmd: list, runs: int, cwd: str = HERE) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def slowest_imports(cmd: list, top: int = 8, cwd: str = HERE) -> list:
+    proc = subprocess.run(
+        [cmd[0], "-X", "importtime"] + cmd[1:],
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # header row
+        rows.append((int(cumulative_us), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_dir = make_build_dir(tmp)
+        # Warm the header index so every timed run does the same work.
+        subprocess.run(BUILD, cwd=build_dir, stdout=subprocess.DEVNULL, check=True)
+
+        print(f"Median of {args.runs} runs:")
+        for label, cmd in COMMANDS.items():
+            print(f"  {label:<16} {time_command(cmd, args.runs):7.1f} ms")
+        label = f"build ({BUILD_IMAGES} img)"
+        print(f"  {label:<16} {time_command(BUILD, args.runs, build_dir):7.1f} ms")
+
+        print("\nSlowest imports for --help (cumulative):")
+        for cumulative_us, name in slowest_imports(COMMANDS["--help"]):
+            print(f"  {cumulative_us / 1000:7.2f} ms  {name.strip()}")
+
+        print("\nSlowest imports for build (cumulative):")
+        for cumulative_us, name in slowest_imports(BUILD, cwd=build_dir):
+            print(f"  {cumulative_us / 1000:7.2f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Named timing spans for --profile runs of the scrape and build scripts.
+
+Code is instrumented with `with span("name"):` blocks. Spans nest, and
+each distinct stack of names ("page;fetch") is timed separately. While
+profiling is off, span() returns a shared no-op context manager, so the
+instrumentation costs almost nothing.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+_NULL = nullcontext()
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        # {("page", "fetch"): [count, total_seconds, max_seconds]}
+        self.stats = {}
+        self._stack = []
+        self._cprofile = None
+
+    def start(self, cprofile: bool = False):
+        self.enabled = True
+        self.stats = {}
+        self._stack = []
+        if cprofile:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.enabled = False
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        self._stack.append(name)
+        path = tuple(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            stat = self.stats.get(path)
+            if stat is None:
+                self.stats[path] = [1, elapsed, elapsed]
+            else:
+                stat[0] += 1
+                stat[1] += elapsed
+                if elapsed > stat[2]:
+                    stat[2] = elapsed
+
+    def self_times(self) -> dict:
+        """
+        Return {path: seconds} with time spent in child spans subtracted.
+        """
+        result = {path: stat[1] for path, stat in self.stats.items()}
+        for path, stat in self.stats.items():
+            parent = path[:-1]
+            if parent in result:
+                result[parent] -= stat[1]
+        return result
+
+    def report(self):
+        if not self.stats:
+            print("\nProfile: no spans recorded.")
+            return
+
+        print("\nProfile (wall time per span):")
+        print(f"  {'span':<32} {'count':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}")
+        for path in sorted(self.stats):
+            count, total, worst = self.stats[path]
+            label = "  " * (len(path) - 1) + path[-1]
+            print(
+                f"  {label:<32} {count:>7} {total * 1000:>10.1f} "
+                f"{total / count * 1000:>9.2f} {worst * 1000:>9.2f}"
+            )
+
+    def write_collapsed(self, path: str):
+        """
+        Write span self-times as collapsed stacks ("a;b;c <microseconds>"),
+        the input format of flamegraph.pl, inferno and speedscope.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(self.self_times().items()):
+                micros = int(round(seconds * 1_000_000))
+                if micros > 0:
+                    f.write(f"{';'.join(stack)} {micros}\n")
+
+    def write_pstats(self, path: str):
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+
+
+PROFILER = Profiler()
+span = PROFILER.span
+
+
+def add_profile_arguments(parser):
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        action="store_true",
+        help="time named stages and print a summary at the end",
+    )
+    group.add_argument(
+        "--profile-pstats",
+        metavar="FILE",
+        help="also run cProfile and dump pstats to FILE (implies --profile)",
+    )
+    group.add_argument(
+        "--profile-collapsed",
+        metavar="FILE",
+        help="write span timings as flamegraph collapsed stacks (implies --profile)",
+    )
+
+
+@contextmanager
+def profile_session(args):
+    """
+    Enable profiling for the duration of the block if any --profile*
+    option was given, then print the summary and write requested files.
+    """
+    pstats_path: Optional[str] = getattr(args, "profile_pstats", None)
+    collapsed_path: Optional[str] = getattr(args, "profile_collapsed", None)
+    if not (getattr(args, "profile", False) or pstats_path or collapsed_path):
+        yield
+        return
+
+    PROFILER.start(cprofile=bool(pstats_path))
+    try:
+        yield
+    finally:
+        PROFILER.stop()
+        PROFILER.report()
+        if pstats_path:
+            PROFILER.write_pstats(pstats_path)
+            print(f"Wrote pstats to {pstats_path}.")
+        if collapsed_path:
+            PROFILER.write_collapsed(collapsed_path)
+            print(f"Wrote collapsed stacks to {collapsed_path}.")
@@ -0,0 +1,80 @@
+import argparse
+import sys
+from typing import Optional
+
+# Subcommand modules are imported inside their handlers, so `--help` and
+# each subcommand only pay for the imports they actually use.
+
+DEFAULT_PORT = 8000
+
+
+def run_scrape(args):
+    import download_brawler_images
+
+    download_brawler_images.main(args.rest, prog="brawler-rater scrape")
+
+
+def run_build(args):
+    import generate_brawler_rater
+
+    generate_brawler_rater.main(args.rest, prog="brawler-rater build")
+
+
+def run_serve(args):
+    import functools
+    import http.server
+
+    handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=args.directory
+    )
+    with http.server.ThreadingHTTPServer((args.bind, args.port), handler) as httpd:
+        print(f"Serving '{args.directory}' at http://{args.bind}:{args.port}/ (Ctrl+C to stop)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="brawler-rater",
+        description="Scrape brawler images, build the rater page and serve it.",
+    )
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    # scrape/build options live in their own modules; unknown arguments are
+    # passed through to them (see main()).
+    scrape = sub.add_parser(
+        "scrape",
+        help="download default-skin images from the wiki",
+        add_help=False,
+    )
+    scrape.set_defaults(func=run_scrape, passthrough=True)
+
+    build = sub.add_parser(
+        "build",
+        help="generate the rater HTML page(s) from the image folder(s)",
+        add_help=False,
+    )
+    build.set_defaults(func=run_build, passthrough=True)
+
+    serve = sub.add_parser("serve", help="serve the generated page locally")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--bind", default="127.0.0.1")
+    serve.add_argument("--directory", default=".")
+    serve.set_defaults(func=run_serve)
+
+    return parser
+
+
+def main(argv: Optional[list] = None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if rest and not getattr(args, "passthrough", False):
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    args.rest = rest
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,28 +1,54 @@
+from __future__ import annotations
+
+import argparse
 import os
 import time
 import re
 import urllib.parse
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from brawler_profiling import add_profile_arguments, profile_session, span
 
-import requests
-from bs4 import BeautifulSoup
+# requests and bs4 are imported on first use so that importing this module
+# (e.g. for `brawler-rater --help`) stays cheap.
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
 
 BASE_WIKI = "https://brawlstars.fandom.com"
 CATEGORY_URL = f"{BASE_WIKI}/wiki/Category:Brawlers"
+API_URL = f"{BASE_WIKI}/api.php"
+CATEGORY_TITLE = "Category:Brawlers"
 OUTPUT_DIR = "brawler_images_default"
 
+# MediaWiki caps "titles=" at 50 per request for normal (non-bot) clients.
+API_BATCH_SIZE = 50
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; BrawlerDefaultSkinScraper/1.0; +https://example.com)"
 }
 
-session = requests.Session()
-session.headers.update(HEADERS)
+_session = None
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        import requests
+
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+    return _session
 
 
 def get_soup(url: str) -> BeautifulSoup:
-    resp = session.get(url)
-    resp.raise_for_status()
-    return BeautifulSoup(resp.text, "html.parser")
+    from bs4 import BeautifulSoup
+
+    with span("fetch"):
+        resp = get_session().get(url)
+        resp.raise_for_status()
+    with span("parse"):
+        return BeautifulSoup(resp.text, "html.parser")
 
 
 def get_brawler_links() -> dict:
@@ -95,6 +121,161 @@ def pick_default_skin_image_url(soup: BeautifulSoup, brawler_name: str) -> Optio
     return None
 
 
+def api_query(params: dict, api_url: str = API_URL) -> Iterator[dict]:
+    """
+    Run an action=query request against the MediaWiki API and yield the
+    "query" block of every response, following "continue" until exhausted.
+    """
+    base = {"action": "query", "format": "json", "formatversion": "2"}
+    base.update(params)
+    cont = {}
+
+    while True:
+        with span("api request"):
+            resp = get_session().get(api_url, params={**base, **cont})
+            resp.raise_for_status()
+            data = resp.json()
+
+        if "error" in data:
+            err = data["error"]
+            raise RuntimeError(f"API error {err.get('code')}: {err.get('info')}")
+
+        yield data.get("query", {})
+
+        if "continue" not in data:
+            break
+        cont = data["continue"]
+
+
+def batched(items: list, size: int = API_BATCH_SIZE) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def get_brawler_titles_api(api_url: str = API_URL) -> list:
+    """
+    Return the article titles in Category:Brawlers.
+
+    Unlike scraping the category page, categorymembers only lists real
+    members, so navigation links and other pages never show up.
+    """
+    print(f"Querying category members: {CATEGORY_TITLE}")
+    titles = []
+    for query in api_query(
+        {
+            "list": "categorymembers",
+            "cmtitle": CATEGORY_TITLE,
+            "cmnamespace": "0",
+            "cmtype": "page",
+            "cmlimit": "max",
+        },
+        api_url,
+    ):
+        for member in query.get("categorymembers", []):
+            titles.append(member["title"])
+
+    print(f"Found {len(titles)} brawlers.")
+    return titles
+
+
+def pick_default_skin_file(title: str, file_titles: list) -> Optional[str]:
+    """
+    Pick the default-skin file for a page from the files it uses.
+
+    prop=images lists files alphabetically, not in page order, so a page
+    that also embeds another brawler's default skin must not simply take
+    the first match. Prefer 'File:<title> Skin-Default.<ext>' and fall back
+    to any file containing 'Skin-Default' only if that one is missing.
+    """
+    own = f"file:{title} skin-default".lower()
+    for file_title in file_titles:
+        if os.path.splitext(file_title)[0].lower() == own:
+            return file_title
+
+    for file_title in file_titles:
+        if "skin-default" in file_title.lower():
+            return file_title
+
+    return None
+
+
+def get_default_skin_files_api(titles: list, api_url: str = API_URL) -> dict:
+    """
+    Return dict {page_title: file_title} for the default-skin file used
+    on each page (see pick_default_skin_file).
+    """
+    images = {}
+
+    for batch in batched(titles):
+        # A page's images may be split across "continue" responses, so
+        # gather them all before picking.
+        for query in api_query(
+            {"prop": "images", "titles": "|".join(batch), "imlimit": "max"},
+            api_url,
+        ):
+            for page in query.get("pages", []):
+                title = page.get("title")
+                if not title:
+                    continue
+                images.setdefault(title, []).extend(
+                    image["title"] for image in page.get("images", [])
+                )
+
+    files = {}
+    for title, file_titles in images.items():
+        file_title = pick_default_skin_file(title, file_titles)
+        if file_title:
+            files[title] = file_title
+
+    return files
+
+
+def get_image_urls_api(file_titles: list, api_url: str = API_URL) -> dict:
+    """
+    Return dict {file_title: original_image_url}.
+    """
+    urls = {}
+
+    for batch in batched(file_titles):
+        for query in api_query(
+            {"prop": "imageinfo", "titles": "|".join(batch), "iiprop": "url"},
+            api_url,
+        ):
+            for page in query.get("pages", []):
+                info = page.get("imageinfo")
+                if info and info[0].get("url"):
+                    urls[page["title"]] = info[0]["url"]
+
+    return urls
+
+
+def get_default_skin_urls_api(api_url: str = API_URL) -> dict:
+    """
+    Return dict {name: image_url} resolved entirely through api.php.
+
+    About 1 + 2 * ceil(n / 50) requests instead of one HTML page per brawler.
+    """
+    with span("category"):
+        titles = get_brawler_titles_api(api_url)
+    with span("pick image"):
+        files = get_default_skin_files_api(titles, api_url)
+        urls = get_image_urls_api(sorted(set(files.values())), api_url)
+
+    result = {}
+    for title in titles:
+        file_title = files.get(title)
+        if not file_title:
+            print(f"  !! No default skin image (Skin-Default) for {title}, skipping.")
+            continue
+        url = urls.get(file_title)
+        if not url:
+            print(f"  !! No URL for {file_title}, skipping.")
+            continue
+        result[title] = url
+
+    return result
+
+
 def slugify(name: str) -> str:
     name = name.strip()
     name = re.sub(r"[^\w\s-]", "", name, flags=re.UNICODE)
@@ -109,24 +290,41 @@ def download_image(name: str, url: str):
     path = os.path.join(OUTPUT_DIR, filename)
 
     print(f"  → Downloading {name} default skin: {url} -> {path}")
-    resp = session.get(url, stream=True)
-    resp.raise_for_status()
+    with span("download"):
+        resp = get_session().get(url, stream=True)
+        resp.raise_for_status()
 
-    with open(path, "wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
-            if chunk:
-                f.write(chunk)
+        with open(path, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=8192):
+                if chunk:
+                    f.write(chunk)
 
 
-def main():
-    brawlers = get_brawler_links()
+def download_via_api(api_url: str = API_URL):
+    images = get_default_skin_urls_api(api_url)
+    print("Starting default-skin downloads…")
+
+    for name, img_url in sorted(images.items()):
+        print(f"\n{name}")
+        try:
+            download_image(name, img_url)
+            time.sleep(1)  # be kind to the server
+        except Exception as e:
+            print(f"  !! Error for {name}: {e}")
+
+
+def download_via_html():
+    with span("category"):
+        brawlers = get_brawler_links()
     print("Starting default-skin downloads…")
 
     for name, url in sorted(brawlers.items()):
         print(f"\n{name}: {url}")
         try:
-            soup = get_soup(url)
-            img_url = pick_default_skin_image_url(soup, name)
+            with span("page"):
+                soup = get_soup(url)
+            with span("pick image"):
+                img_url = pick_default_skin_image_url(soup, name)
             if not img_url:
                 print("  !! No default skin image (Skin-Default) found, skipping.")
                 continue
@@ -137,5 +335,31 @@ def main():
             print(f"  !! Error for {name}: {e}")
 
 
+def main(argv: Optional[list] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Download default-skin brawler images from the Brawl Stars wiki."
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("html", "api"),
+        default="html",
+        help="html: scrape each brawler page; api: batched api.php queries",
+    )
+    parser.add_argument(
+        "--api-url",
+        default=API_URL,
+        help="api.php endpoint for the api backend (e.g. a local stand-in)",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_session(args):
+        if args.backend == "api":
+            download_via_api(args.api_url)
+        else:
+            download_via_html()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,27 @@
+import argparse
 import os
 import json
 import re
+import struct
+import textwrap
+from html import escape
+from typing import Optional
+
+from brawler_profiling import add_profile_arguments, profile_session, span
 
 IMAGE_DIR = "brawler_images_default"
 OUTPUT_HTML = "index.html"
+IMAGE_INDEX = ".brawler_image_index.json"
+
+DEFAULT_TITLE = "Brawler Rater"
+# localStorage key prefix; raters served from the same origin need distinct ones.
+DEFAULT_STORAGE_PREFIX = "brawler"
 
 IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
 
+# JPEG start-of-frame markers (SOF0-SOF15, minus DHT/JPG/DAC).
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
 
 def pretty_name_from_filename(filename: str) -> str:
     base = os.path.splitext(filename)[0]
@@ -15,40 +30,256 @@ def pretty_name_from_filename(filename: str) -> str:
     return base.strip()
 
 
-def collect_brawlers():
-    if not os.path.isdir(IMAGE_DIR):
+def _read_jpeg_size(f) -> Optional[tuple]:
+    """
+    Walk JPEG markers until the first SOF segment, seeking over the
+    payload of every other segment (EXIF, ICC, ...) without reading it.
+    """
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+
+        marker = byte[0]
+        if marker == 0xD8 or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue
+        if marker == 0xD9 or marker == 0xDA:
+            return None
+
+        seg = f.read(2)
+        if len(seg) < 2:
+            return None
+        length = struct.unpack(">H", seg)[0]
+        if length < 2:
+            return None
+
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_header(path: str) -> Optional[dict]:
+    """
+    Return {"format", "width", "height"} read from the file header only,
+    or None if the format is not recognised or the header is truncated
+    (e.g. an interrupted download).
+    """
+    with open(path, "rb") as f:
+        head = f.read(32)
+
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            if len(head) < 24:
+                return None
+            width, height = struct.unpack(">II", head[16:24])
+            return {"format": "png", "width": width, "height": height}
+
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            if len(head) < 10:
+                return None
+            width, height = struct.unpack("<HH", head[6:10])
+            return {"format": "gif", "width": width, "height": height}
+
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8 " and len(head) >= 30:
+                width, height = struct.unpack("<HH", head[26:30])
+                width &= 0x3FFF
+                height &= 0x3FFF
+            elif chunk == b"VP8L" and len(head) >= 25:
+                bits = struct.unpack("<I", head[21:25])[0]
+                width = (bits & 0x3FFF) + 1
+                height = ((bits >> 14) & 0x3FFF) + 1
+            elif chunk == b"VP8X" and len(head) >= 30:
+                width = int.from_bytes(head[24:27], "little") + 1
+                height = int.from_bytes(head[27:30], "little") + 1
+            else:
+                return None
+            return {"format": "webp", "width": width, "height": height}
+
+        if head[:2] == b"\xff\xd8":
+            size = _read_jpeg_size(f)
+            if size is None:
+                return None
+            return {"format": "jpeg", "width": size[0], "height": size[1]}
+
+    return None
+
+
+def load_image_index(path: str = IMAGE_INDEX) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
+def save_image_index(index: dict, path: str = IMAGE_INDEX):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def image_metadata(rel_path: str, index: Optional[dict]) -> dict:
+    """
+    Return cached header metadata for an image, re-reading the header
+    only when the file's mtime or size changed since it was indexed.
+    With index=None nothing is cached.
+    """
+    st = os.stat(rel_path)
+    cached = index.get(rel_path) if index is not None else None
+    if (
+        cached
+        and cached.get("mtime_ns") == st.st_mtime_ns
+        and cached.get("bytes") == st.st_size
+    ):
+        return cached
+
+    meta = {"mtime_ns": st.st_mtime_ns, "bytes": st.st_size}
+    try:
+        with span("read header"):
+            header = read_image_header(rel_path)
+    except (OSError, struct.error):
+        header = None
+    if header:
+        meta.update(header)
+
+    if index is not None:
+        index[rel_path] = meta
+    return meta
+
+
+def image_files(image_dir: str) -> list:
+    """
+    Return the sorted image filenames in image_dir.
+
+    Only the names are held; per-image entries are built lazily by
+    collect_brawlers().
+    """
+    if not os.path.isdir(image_dir):
         raise SystemExit(
-            f"Image directory '{IMAGE_DIR}' not found. "
+            f"Image directory '{image_dir}' not found. "
             f"Make sure it's next to this script."
         )
 
-    entries = []
-    for fname in sorted(os.listdir(IMAGE_DIR)):
-        ext = os.path.splitext(fname)[1].lower()
-        if ext not in IMAGE_EXTS:
-            continue
-        name = pretty_name_from_filename(fname)
-        rel_path = f"{IMAGE_DIR}/{fname}"
-        entries.append({"name": name, "file": rel_path})
-
-    if not entries:
+    with os.scandir(image_dir) as it:
+        names = [
+            entry.name
+            for entry in it
+            if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTS
+            and entry.is_file()
+        ]
+    names.sort()
+    return names
+
+
+def refresh_image_index(image_dirs, index: dict):
+    """
+    Bring the index up to date for every image in image_dirs, so each file
+    header is read at most once however many catalogs use it.
+    """
+    for image_dir in image_dirs:
+        with span("scan"):
+            names = image_files(image_dir)
+        for fname in names:
+            with span("collect"):
+                image_metadata(f"{image_dir}/{fname}", index)
+
+
+def collect_brawlers(
+    image_dir: str = IMAGE_DIR,
+    output_html: str = OUTPUT_HTML,
+    index: Optional[dict] = None,
+):
+    """
+    Yield an entry for every image in image_dir, with "file" paths
+    relative to the directory output_html is written to.
+
+    Raises SystemExit once exhausted if no image was found.
+    """
+    out_dir = os.path.dirname(output_html) or "."
+
+    with span("scan"):
+        names = image_files(image_dir)
+
+    count = 0
+    for fname in names:
+        # Not held open across the yield: the consumer's time is its own span.
+        with span("collect"):
+            name = pretty_name_from_filename(fname)
+            rel_path = f"{image_dir}/{fname}"
+            src = os.path.relpath(rel_path, out_dir).replace(os.sep, "/")
+            entry = {"name": name, "file": src}
+
+            meta = image_metadata(rel_path, index)
+            for key in ("width", "height", "format", "bytes"):
+                if key in meta:
+                    entry[key] = meta[key]
+        count += 1
+        yield entry
+
+    if not count:
         raise SystemExit(
-            f"No images found in '{IMAGE_DIR}' with extensions: {IMAGE_EXTS}"
+            f"No images found in '{image_dir}' with extensions: {IMAGE_EXTS}"
         )
 
-    return entries
 
-
-def generate_html(brawlers):
-    data_json = json.dumps(brawlers, ensure_ascii=False, indent=2)
-
-    # Plain triple-quoted string (NOT an f-string).
-    # We concatenate data_json once into the JS.
-    html = """<!DOCTYPE html>
+def iter_json_array(items, counter: list):
+    """
+    Encode items as an indented JSON array one element at a time, so the
+    full array never exists as a single string. counter[0] is incremented
+    per element. Output matches json.dumps(list(items), indent=2).
+    """
+    sep = "[\n"
+    for item in items:
+        with span("render"):
+            chunk = textwrap.indent(json.dumps(item, ensure_ascii=False, indent=2), "  ")
+        yield sep
+        yield chunk
+        counter[0] += 1
+        sep = ",\n"
+    yield "[]" if sep == "[\n" else "\n]"
+
+
+def generate_html(
+    brawlers,
+    output_html: str = OUTPUT_HTML,
+    title: str = DEFAULT_TITLE,
+    storage_prefix: str = DEFAULT_STORAGE_PREFIX,
+    metrics_endpoint: Optional[str] = None,
+    release: Optional[str] = None,
+) -> int:
+    """
+    Stream the page to output_html and return the number of brawlers.
+
+    If metrics_endpoint is set, the page POSTs its performance summary
+    there (tagged with release) when it is hidden.
+
+    brawlers may be any iterable (e.g. collect_brawlers()); it is consumed
+    once while writing, so memory does not grow with the catalog size.
+    The page is written to a temporary file and moved into place only
+    once complete.
+    """
+    counter = [0]
+
+    # Plain triple-quoted strings (NOT f-strings), written in order.
+    # The brawler data is encoded into the JS element by element.
+    parts = ["""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8" />
-  <title>Brawler Rater</title>
+  <title>""", escape(title), """</title>
   <meta name="viewport" content="width=device-width, initial-scale=1" />
   <style>
     * {
@@ -121,6 +352,8 @@ def generate_html(brawlers):
     .image-wrapper img {
       max-width: 100%;
       max-height: 320px;
+      height: auto;
+      object-fit: contain;
       display: block;
     }
     .info {
@@ -258,6 +491,54 @@ def generate_html(brawlers):
       color: #6b7280;
       font-style: italic;
     }
+    .compare {
+      display: flex;
+      gap: 16px;
+      flex-wrap: wrap;
+      justify-content: center;
+      margin-bottom: 12px;
+    }
+    button.compare-option {
+      flex: 1 1 220px;
+      max-width: 320px;
+      border: 1px solid #1f2937;
+      border-radius: 16px;
+      padding: 12px;
+      cursor: pointer;
+      background: radial-gradient(circle at top, #0ea5e9, #020617);
+      color: #e5e7eb;
+      font-size: 1.05rem;
+      font-weight: 600;
+      transition: transform 0.05s ease-out, box-shadow 0.05s ease-out;
+    }
+    button.compare-option:hover {
+      transform: translateY(-1px);
+      box-shadow: 0 4px 12px rgba(0,0,0,0.5);
+    }
+    button.compare-option img {
+      max-width: 100%;
+      max-height: 240px;
+      height: auto;
+      object-fit: contain;
+      display: block;
+      margin: 0 auto 8px;
+    }
+    .perf-overlay {
+      position: fixed;
+      right: 8px;
+      bottom: 8px;
+      max-width: calc(100vw - 16px);
+      max-height: 60vh;
+      overflow: auto;
+      background: rgba(2, 6, 23, 0.92);
+      border: 1px solid #1f2937;
+      border-radius: 8px;
+      padding: 8px 10px;
+      font: 11px/1.4 ui-monospace, SFMono-Regular, Menlo, monospace;
+      color: #e5e7eb;
+      white-space: pre;
+      z-index: 1000;
+    }
     @media print {
       body {
         background: #ffffff;
@@ -269,7 +550,9 @@ def generate_html(brawlers):
         max-width: 100%;
         border-radius: 0;
       }
-      #ratingView {
+      #ratingView,
+      #rankingView,
+      #perfOverlay {
         display: none !important;
       }
       #resultsView {
@@ -280,7 +563,7 @@ def generate_html(brawlers):
 </head>
 <body>
   <div class="app">
-    <h1>Brawler Rater</h1>
+    <h1>""", escape(title), """</h1>
     <div class="subtitle-row">
       <div class="subtitle">
         Rate each brawler one by one. Your ratings are saved locally in this browser, and you can export/import them as JSON.
@@ -326,6 +609,7 @@ def generate_html(brawlers):
         <h2>Results by rating</h2>
         <div style="display:flex; gap:8px; flex-wrap:wrap;">
           <button id="backToRatingBtn" type="button">Back to rating</button>
+          <button id="rankBtn" type="button">Rank within tiers</button>
           <button id="downloadBtn" type="button">Download results (JSON)</button>
           <button id="uploadBtn" type="button">Load results (JSON)</button>
           <button id="printBtn" type="button">Print / Save as PDF</button>
@@ -334,13 +618,37 @@ def generate_html(brawlers):
       </div>
       <div class="buckets" id="bucketsContainer"></div>
     </div>
+
+    <div id="rankingView" class="hidden">
+      <div class="results-header">
+        <h2>Which do you prefer?</h2>
+        <button id="backToResultsBtn" type="button">Back to results</button>
+      </div>
+      <div class="compare">
+        <button class="compare-option" id="compareLeft" type="button">
+          <img id="compareLeftImage" src="" alt="" />
+          <span id="compareLeftName"></span>
+        </button>
+        <button class="compare-option" id="compareRight" type="button">
+          <img id="compareRightImage" src="" alt="" />
+          <span id="compareRightName"></span>
+        </button>
+      </div>
+      <div class="progress" id="rankProgressText"></div>
+    </div>
   </div>
 
+  <div id="perfOverlay" class="perf-overlay hidden"></div>
+
   <script>
     // Base set of brawlers from the image folder.
-    const BASE_BRAWLERS = """ + data_json + """;
+    const BASE_BRAWLERS = """, iter_json_array(brawlers, counter), """;
     let BRAWLERS = BASE_BRAWLERS.slice();
 
+    const STORAGE_PREFIX = """, json.dumps(storage_prefix), """;
+    const METRICS_ENDPOINT = """, json.dumps(metrics_endpoint), """;
+    const RELEASE = """, json.dumps(release), """;
+
     const RATINGS_ORDER = [
       "Love",
       "Like",
@@ -349,9 +657,16 @@ def generate_html(brawlers):
       "Not familiar"
     ];
 
+    // Tiers that can be ordered by pairwise comparison.
+    const RANKED_RATINGS = RATINGS_ORDER.filter(r => r !== "Not familiar");
+
     let currentIndex = 0;
     let ratings = {};
 
+    // Pairwise ranking state. order[rating] lists names best-first;
+    // pending is the binary insertion currently in progress, if any.
+    let ranking = emptyRanking();
+
     const imgEl = document.getElementById("brawlerImage");
     const nameEl = document.getElementById("brawlerName");
     const progressEl = document.getElementById("progressText");
@@ -370,10 +685,251 @@ def generate_html(brawlers):
     const printBtn = document.getElementById("printBtn");
     const restartBtn = document.getElementById("restartBtn");
     const backToRatingBtn = document.getElementById("backToRatingBtn");
+    const rankBtn = document.getElementById("rankBtn");
+    const rankingView = document.getElementById("rankingView");
+    const backToResultsBtn = document.getElementById("backToResultsBtn");
+    const compareLeft = document.getElementById("compareLeft");
+    const compareRight = document.getElementById("compareRight");
+    const compareLeftImage = document.getElementById("compareLeftImage");
+    const compareRightImage = document.getElementById("compareRightImage");
+    const compareLeftName = document.getElementById("compareLeftName");
+    const compareRightName = document.getElementById("compareRightName");
+    const rankProgressEl = document.getElementById("rankProgressText");
+    const perfOverlay = document.getElementById("perfOverlay");
+
+    // Real-user performance instrumentation. Durations are recorded with the
+    // User Timing API (visible in DevTools) and kept per name for percentile
+    // summaries. Open the page with ?perf to show the overlay and include
+    // the summary in exported JSON; METRICS_ENDPOINT (set at build time)
+    // receives it whenever the page is hidden.
+    const PERF_SUPPORTED = typeof performance !== "undefined" &&
+      typeof performance.mark === "function" &&
+      typeof performance.measure === "function";
+    const PERF_DEBUG = /[?&#]perf\\b/.test(window.location.search + window.location.hash);
+    const PERF_MAX_SAMPLES = 500;
+    const perfSamples = {};
+    const perfLongTasks = [];
+    let perfLcp = null;
+
+    // Samples not yet sent to METRICS_ENDPOINT. Each report carries only
+    // these, plus a per-page-load session id and sequence number, so the
+    // server never receives a sample twice.
+    const PERF_SESSION_ID = (window.crypto && typeof window.crypto.randomUUID === "function")
+      ? window.crypto.randomUUID()
+      : Date.now().toString(36) + Math.random().toString(36).slice(2);
+    let perfUnsent = { measures: {}, longTasks: [] };
+    let perfLcpSent = false;
+    let perfSeq = 0;
+
+    function pushCapped(list, value) {
+      list.push(value);
+      if (list.length > PERF_MAX_SAMPLES) list.shift();
+    }
+
+    function recordPerf(name, duration) {
+      pushCapped(perfSamples[name] || (perfSamples[name] = []), duration);
+      pushCapped(perfUnsent.measures[name] || (perfUnsent.measures[name] = []), duration);
+    }
+
+    function perfStart(name) {
+      if (!PERF_SUPPORTED) return null;
+      const markName = name + ":start";
+      performance.mark(markName);
+      return { name, markName, start: performance.now() };
+    }
+
+    function perfEnd(token) {
+      if (!token || token.done) return;
+      token.done = true;
+      const duration = performance.now() - token.start;
+      try {
+        performance.measure(token.name, token.markName);
+      } catch (e) {
+        // Mark was cleared (e.g. by another tool); the duration is still valid.
+      }
+      performance.clearMarks(token.markName);
+      recordPerf(token.name, duration);
+    }
+
+    function timed(name, fn) {
+      return function () {
+        const token = perfStart(name);
+        try {
+          return fn.apply(this, arguments);
+        } finally {
+          perfEnd(token);
+        }
+      };
+    }
+
+    // Time from setting src to the load event ("<name>Load"), then the
+    // decode that follows it ("<name>Decode").
+    function watchImage(img, name) {
+      img.addEventListener("load", () => {
+        if (!PERF_SUPPORTED || img._perfStart === undefined) return;
+        const loaded = performance.now();
+        recordPerf(name + "Load", loaded - img._perfStart);
+        img._perfStart = undefined;
+        if (typeof img.decode === "function") {
+          img.decode()
+            .then(() => recordPerf(name + "Decode", performance.now() - loaded))
+            .catch(() => {});
+        }
+      });
+    }
+
+    function setImageSrc(img, src) {
+      if (PERF_SUPPORTED) img._perfStart = performance.now();
+      img.src = src;
+    }
+
+    function observePerf(type, callback) {
+      if (typeof PerformanceObserver === "undefined") return;
+      try {
+        new PerformanceObserver(list => list.getEntries().forEach(callback))
+          .observe({ type, buffered: true });
+      } catch (e) {
+        // Entry type not supported by this browser.
+      }
+    }
+
+    observePerf("longtask", entry => {
+      pushCapped(perfLongTasks, entry.duration);
+      pushCapped(perfUnsent.longTasks, entry.duration);
+    });
+    observePerf("largest-contentful-paint", entry => {
+      perfLcp = entry.startTime;
+    });
+
+    function percentile(sorted, p) {
+      if (sorted.length === 0) return null;
+      const i = Math.min(sorted.length - 1, Math.ceil(p / 100 * sorted.length) - 1);
+      return sorted[Math.max(i, 0)];
+    }
+
+    function summarize(values) {
+      const sorted = values.slice().sort((a, b) => a - b);
+      const round = v => v === null ? null : Math.round(v * 10) / 10;
+      return {
+        count: sorted.length,
+        p50: round(percentile(sorted, 50)),
+        p75: round(percentile(sorted, 75)),
+        p95: round(percentile(sorted, 95)),
+        max: round(sorted.length ? sorted[sorted.length - 1] : null)
+      };
+    }
+
+    function perfSummary() {
+      const measures = {};
+      Object.keys(perfSamples).sort().forEach(name => {
+        measures[name] = summarize(perfSamples[name]);
+      });
+      return {
+        release: RELEASE,
+        brawlers: BRAWLERS.length,
+        userAgent: navigator.userAgent,
+        measures,
+        longTasks: {
+          ...summarize(perfLongTasks),
+          total: Math.round(perfLongTasks.reduce((a, b) => a + b, 0))
+        },
+        lcp: perfLcp === null ? null : Math.round(perfLcp)
+      };
+    }
+
+    function renderPerfOverlay() {
+      const summary = perfSummary();
+      const pad = (v, n) => String(v === null ? "-" : v).padStart(n);
+      const lines = ["name                   n    p50    p95    max"];
+      Object.keys(summary.measures).forEach(name => {
+        const m = summary.measures[name];
+        lines.push(name.padEnd(18) + pad(m.count, 5) + pad(m.p50, 7) + pad(m.p95, 7) + pad(m.max, 7));
+      });
+      const lt = summary.longTasks;
+      lines.push("long tasks: " + lt.count + " (" + lt.total + " ms total, max " + (lt.max === null ? "-" : lt.max) + ")");
+      lines.push("LCP: " + (summary.lcp === null ? "-" : summary.lcp + " ms"));
+      perfOverlay.textContent = lines.join("\\n");
+    }
+
+    // Send the raw samples recorded since the last report, so the server can
+    // compute percentiles across sessions. The body is a plain string
+    // (text/plain, CORS-safelisted): sendBeacon may throw on or refuse
+    // other types, and fetch is used whenever sendBeacon does not queue it.
+    function sendPerfMetrics() {
+      if (!METRICS_ENDPOINT) return;
+      const lcpPending = perfLcp !== null && !perfLcpSent;
+      if (
+        Object.keys(perfUnsent.measures).length === 0 &&
+        perfUnsent.longTasks.length === 0 &&
+        !lcpPending
+      ) {
+        return;
+      }
+
+      const round = v => Math.round(v * 10) / 10;
+      const samples = {};
+      Object.keys(perfUnsent.measures).forEach(name => {
+        samples[name] = perfUnsent.measures[name].map(round);
+      });
+      const body = JSON.stringify({
+        session: PERF_SESSION_ID,
+        seq: perfSeq++,
+        release: RELEASE,
+        brawlers: BRAWLERS.length,
+        userAgent: navigator.userAgent,
+        samples,
+        longTasks: perfUnsent.longTasks.map(round),
+        lcp: lcpPending ? Math.round(perfLcp) : null
+      });
+      perfUnsent = { measures: {}, longTasks: [] };
+      if (lcpPending) perfLcpSent = true;
+
+      let queued = false;
+      if (typeof navigator.sendBeacon === "function") {
+        try {
+          queued = navigator.sendBeacon(METRICS_ENDPOINT, body);
+        } catch (e) {
+          queued = false;
+        }
+      }
+      if (!queued && window.fetch) {
+        fetch(METRICS_ENDPOINT, {
+          method: "POST",
+          body,
+          headers: { "Content-Type": "text/plain;charset=UTF-8" },
+          keepalive: true
+        }).catch(() => {});
+      }
+    }
+
+    function emptyRanking() {
+      return { order: {}, pending: null, comparisons: 0 };
+    }
+
+    function normalizeRanking(data) {
+      const result = emptyRanking();
+      if (!data || typeof data !== "object") return result;
+
+      if (data.order && typeof data.order === "object") {
+        for (const rating of RANKED_RATINGS) {
+          if (Array.isArray(data.order[rating])) {
+            result.order[rating] = data.order[rating].slice();
+          }
+        }
+      }
+      const p = data.pending;
+      if (p && typeof p === "object" && RANKED_RATINGS.includes(p.rating)) {
+        result.pending = { rating: p.rating, name: p.name, lo: p.lo, hi: p.hi };
+      }
+      if (Number.isInteger(data.comparisons)) {
+        result.comparisons = data.comparisons;
+      }
+      return result;
+    }
 
     function loadStored() {
       try {
-        const raw = window.localStorage.getItem("brawlerRatings");
+        const raw = window.localStorage.getItem(STORAGE_PREFIX + "Ratings");
         if (raw) {
           const parsed = JSON.parse(raw);
           if (parsed && typeof parsed === "object") {
@@ -385,7 +941,7 @@ def generate_html(brawlers):
       }
 
       try {
-        const idxRaw = window.localStorage.getItem("brawlerCurrentIndex");
+        const idxRaw = window.localStorage.getItem(STORAGE_PREFIX + "CurrentIndex");
         if (idxRaw !== null) {
           const idx = parseInt(idxRaw, 10);
           if (!Number.isNaN(idx) && idx >= 0 && idx < BRAWLERS.length) {
@@ -395,12 +951,22 @@ def generate_html(brawlers):
       } catch (e) {
         console.warn("Failed to load stored index:", e);
       }
+
+      try {
+        const rankRaw = window.localStorage.getItem(STORAGE_PREFIX + "Ranking");
+        if (rankRaw) {
+          ranking = normalizeRanking(JSON.parse(rankRaw));
+        }
+      } catch (e) {
+        console.warn("Failed to load stored ranking:", e);
+      }
     }
 
     function saveStored() {
       try {
-        window.localStorage.setItem("brawlerRatings", JSON.stringify(ratings));
-        window.localStorage.setItem("brawlerCurrentIndex", String(currentIndex));
+        window.localStorage.setItem(STORAGE_PREFIX + "Ratings", JSON.stringify(ratings));
+        window.localStorage.setItem(STORAGE_PREFIX + "CurrentIndex", String(currentIndex));
+        window.localStorage.setItem(STORAGE_PREFIX + "Ranking", JSON.stringify(ranking));
       } catch (e) {
         console.warn("Failed to save ratings:", e);
       }
@@ -417,6 +983,18 @@ def generate_html(brawlers):
       });
     }
 
+    // Reserve layout space from the header dimensions recorded at build time,
+    // so the page does not reflow when the image arrives.
+    function applyImageSize(img, b) {
+      if (b.width && b.height) {
+        img.width = b.width;
+        img.height = b.height;
+      } else {
+        img.removeAttribute("width");
+        img.removeAttribute("height");
+      }
+    }
+
     function showBrawler(index) {
       const total = BRAWLERS.length;
       if (index < 0 || index >= total) {
@@ -425,7 +1003,8 @@ def generate_html(brawlers):
       }
 
       const b = BRAWLERS[index];
-      imgEl.src = b.file;
+      applyImageSize(imgEl, b);
+      setImageSrc(imgEl, b.file);
       imgEl.alt = b.name;
       nameEl.textContent = b.name;
 
@@ -444,12 +1023,14 @@ def generate_html(brawlers):
 
     function showResults() {
       ratingView.classList.add("hidden");
+      rankingView.classList.add("hidden");
       resultsView.classList.remove("hidden");
       buildBuckets();
     }
 
     function restart() {
       ratings = {};
+      ranking = emptyRanking();
       currentIndex = 0;
       BRAWLERS = BASE_BRAWLERS.slice();
       saveStored();
@@ -460,6 +1041,9 @@ def generate_html(brawlers):
 
     function handleRatingClick(ratingValue) {
       const b = BRAWLERS[currentIndex];
+      if (ranking.pending && ranking.pending.name === b.name && ratings[b.name] !== ratingValue) {
+        ranking.pending = null;
+      }
       ratings[b.name] = ratingValue;
       saveStored();
       setSelectedButton(ratingValue);
@@ -471,6 +1055,140 @@ def generate_html(brawlers):
       }
     }
 
+    function tierMembers(rating) {
+      return BRAWLERS
+        .filter(b => (ratings[b.name] || "Not familiar") === rating)
+        .map(b => b.name);
+    }
+
+    function findBrawler(name) {
+      return BRAWLERS.find(b => b.name === name) || { name, file: "" };
+    }
+
+    // Return the next comparison to ask, or null when every tier is ordered.
+    //
+    // Each tier is sorted by binary insertion: a new name is placed into the
+    // already-ordered list by halving [lo, hi) on every answer. Inserting
+    // into a list of k needs ceil(log2(k + 1)) answers, so a tier of n costs
+    // close to log2(n!) comparisons, and ranking only within the rating
+    // buckets avoids comparing brawlers the ratings already separate.
+    function nextComparison() {
+      const p = ranking.pending;
+      if (p) {
+        // Drop names that left the tier (re-rated or removed by an import).
+        // If any did, lo/hi no longer index the same list, so restart the
+        // insertion rather than compare against a brawler outside the tier.
+        const members = tierMembers(p.rating);
+        const memberSet = new Set(members);
+        const stored = ranking.order[p.rating] || [];
+        const order = stored.filter(n => memberSet.has(n));
+        ranking.order[p.rating] = order;
+        if (
+          order.length === stored.length &&
+          memberSet.has(p.name) &&
+          !order.includes(p.name) &&
+          Number.isInteger(p.lo) && Number.isInteger(p.hi) &&
+          p.lo >= 0 && p.lo < p.hi && p.hi <= order.length
+        ) {
+          return p;
+        }
+        ranking.pending = null;
+      }
+
+      for (const rating of RANKED_RATINGS) {
+        const members = tierMembers(rating);
+        const memberSet = new Set(members);
+        const order = (ranking.order[rating] || []).filter(n => memberSet.has(n));
+        ranking.order[rating] = order;
+
+        const placed = new Set(order);
+        for (const name of members) {
+          if (placed.has(name)) continue;
+          if (order.length === 0) {
+            order.push(name);
+            placed.add(name);
+            continue;
+          }
+          ranking.pending = { rating, name, lo: 0, hi: order.length };
+          return ranking.pending;
+        }
+      }
+      return null;
+    }
+
+    function estimateRemainingComparisons() {
+      let total = 0;
+      for (const rating of RANKED_RATINGS) {
+        let placed = (ranking.order[rating] || []).length;
+        const members = tierMembers(rating);
+        const remaining = members.length - placed;
+        for (let i = 0; i < remaining; i++) {
+          if (placed > 0) total += Math.ceil(Math.log2(placed + 1));
+          placed++;
+        }
+      }
+      const p = ranking.pending;
+      if (p) {
+        // Replace the full estimate for the pending insertion with what is left of it.
+        const size = (ranking.order[p.rating] || []).length;
+        total -= Math.ceil(Math.log2(size + 1));
+        total += Math.ceil(Math.log2(p.hi - p.lo + 1));
+      }
+      return Math.max(total, 0);
+    }
+
+    function showRanking() {
+      const p = nextComparison();
+      saveStored();
+      if (!p) {
+        showResults();
+        return;
+      }
+
+      ratingView.classList.add("hidden");
+      resultsView.classList.add("hidden");
+      rankingView.classList.remove("hidden");
+
+      const mid = (p.lo + p.hi) >> 1;
+      const left = findBrawler(p.name);
+      const right = findBrawler(ranking.order[p.rating][mid]);
+
+      applyImageSize(compareLeftImage, left);
+      setImageSrc(compareLeftImage, left.file);
+      compareLeftImage.alt = left.name;
+      compareLeftName.textContent = left.name;
+
+      applyImageSize(compareRightImage, right);
+      setImageSrc(compareRightImage, right.file);
+      compareRightImage.alt = right.name;
+      compareRightName.textContent = right.name;
+
+      const tier = p.rating === "Dont like" ? "Don't like" : p.rating;
+      rankProgressEl.textContent =
+        "Ranking " + tier + " tier: " +
+        ranking.comparisons + " comparisons so far, about " +
+        estimateRemainingComparisons() + " left";
+    }
+
+    function handleComparison(preferCandidate) {
+      const p = ranking.pending;
+      if (!p) return;
+
+      const mid = (p.lo + p.hi) >> 1;
+      if (preferCandidate) {
+        p.hi = mid;
+      } else {
+        p.lo = mid + 1;
+      }
+      ranking.comparisons++;
+
+      if (p.lo >= p.hi) {
+        ranking.order[p.rating].splice(p.lo, 0, p.name);
+        ranking.pending = null;
+      }
+      showRanking();
+    }
+
     function buildBuckets() {
       bucketsContainer.innerHTML = "";
       const byRating = {};
@@ -494,6 +1212,12 @@ def generate_html(brawlers):
         grid.className = "bucket-grid";
 
         const list = byRating[rating] || [];
+        const order = ranking.order[rating] || [];
+        const position = name => {
+          const i = order.indexOf(name);
+          return i === -1 ? order.length : i;
+        };
+        list.sort((a, b) => position(a.name) - position(b.name));
         if (list.length === 0) {
           const empty = document.createElement("div");
           empty.className = "bucket-empty";
@@ -506,11 +1230,13 @@ def generate_html(brawlers):
             item.className = "bucket-item";
 
             const img = document.createElement("img");
+            applyImageSize(img, b);
             img.src = b.file;
             img.alt = b.name;
 
             const name = document.createElement("div");
-            name.textContent = b.name;
+            const rank = order.indexOf(b.name);
+            name.textContent = rank === -1 ? b.name : (rank + 1) + ". " + b.name;
 
             item.appendChild(img);
             item.appendChild(name);
@@ -532,6 +1258,7 @@ def generate_html(brawlers):
       const file = event.target.files && event.target.files[0];
       if (!file) return;
 
+      const perfToken = perfStart("handleUploadFile");
       const reader = new FileReader();
       reader.onload = (e) => {
         try {
@@ -539,6 +1266,7 @@ def generate_html(brawlers):
           const data = JSON.parse(text);
 
           if (!data || typeof data !== "object") {
+            perfEnd(perfToken);
             alert("Invalid JSON format.");
             return;
           }
@@ -555,20 +1283,44 @@ def generate_html(brawlers):
             ratings = {};
           }
 
+          ranking = normalizeRanking(data.ranking);
+
           currentIndex = 0;
           saveStored();
           showResults();
+          // End before the blocking alert so it is not part of the measure.
+          perfEnd(perfToken);
           alert("Results loaded from JSON.");
         } catch (err) {
+          perfEnd(perfToken);
           console.error("Failed to parse JSON:", err);
           alert("Failed to parse JSON file.");
         } finally {
           uploadInput.value = "";
+          perfEnd(perfToken);
         }
       };
+      reader.onerror = () => {
+        console.error("Failed to read file:", reader.error);
+        uploadInput.value = "";
+        perfEnd(perfToken);
+        alert("Failed to read the selected file.");
+      };
+      reader.onabort = () => {
+        uploadInput.value = "";
+        perfEnd(perfToken);
+      };
       reader.readAsText(file);
     }
 
+    // Instrument the hot paths before they are wired to events.
+    showBrawler = timed("showBrawler", showBrawler);
+    buildBuckets = timed("buildBuckets", buildBuckets);
+    saveStored = timed("saveStored", saveStored);
+    watchImage(imgEl, "image");
+    watchImage(compareLeftImage, "compareImage");
+    watchImage(compareRightImage, "compareImage");
+
     // Event wiring
     ratingButtons.forEach(btn => {
       btn.addEventListener("click", () => {
@@ -604,8 +1356,12 @@ def generate_html(brawlers):
     downloadBtn.addEventListener("click", () => {
       const data = {
         ratings,
+        ranking,
         brawlers: BRAWLERS
       };
+      if (PERF_DEBUG) {
+        data.metrics = perfSummary();
+      }
       const blob = new Blob([JSON.stringify(data, null, 2)], { type: "application/json" });
       const url = URL.createObjectURL(blob);
       const a = document.createElement("a");
@@ -631,6 +1387,11 @@ def generate_html(brawlers):
       window.print();
     });
 
+    rankBtn.addEventListener("click", showRanking);
+    backToResultsBtn.addEventListener("click", showResults);
+    compareLeft.addEventListener("click", () => handleComparison(true));
+    compareRight.addEventListener("click", () => handleComparison(false));
+
     restartBtn.addEventListener("click", () => {
       if (confirm("Clear all ratings and start over?")) {
         restart();
@@ -655,6 +1416,18 @@ def generate_html(brawlers):
       });
     }
 
+    document.addEventListener("visibilitychange", () => {
+      if (document.visibilityState === "hidden") {
+        sendPerfMetrics();
+      }
+    });
+
+    if (PERF_DEBUG) {
+      perfOverlay.classList.remove("hidden");
+      renderPerfOverlay();
+      setInterval(renderPerfOverlay, 1000);
+    }
+
     // Init
     loadStored();
 
@@ -670,17 +1443,186 @@ def generate_html(brawlers):
   </script>
 </body>
 </html>
-"""
+"""]
+
+    out_dir = os.path.dirname(output_html)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    tmp = output_html + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for part in parts:
+                chunks = (part,) if isinstance(part, str) else part
+                for chunk in chunks:
+                    with span("write"):
+                        f.write(chunk)
+        os.replace(tmp, output_html)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    return counter[0]
+
+
+CATALOG_KEYS = ("image_dir", "output", "title", "storage_prefix", "metrics_endpoint", "release")
+
+
+def load_build_config(path: str) -> list:
+    """
+    Read a build config and return its list of catalogs.
+
+    The config is JSON: {"catalogs": [{"image_dir": ..., "output": ...,
+    "title": ..., "storage_prefix": ..., "metrics_endpoint": ...,
+    "release": ...}, ...]}. Only image_dir and output are required, and
+    every value must be a string. Relative image_dir and output paths
+    resolve against the working directory, not the config file's directory.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except OSError as e:
+        raise SystemExit(f"Cannot read build config '{path}': {e.strerror or e}")
+    except ValueError as e:
+        raise SystemExit(f"Build config '{path}' is not valid JSON: {e}")
+
+    catalogs = config.get("catalogs") if isinstance(config, dict) else None
+    if not isinstance(catalogs, list) or not catalogs:
+        raise SystemExit(f"Build config '{path}' has no \"catalogs\" list.")
+
+    outputs = set()
+    for i, catalog in enumerate(catalogs):
+        if not isinstance(catalog, dict):
+            raise SystemExit(f"Catalog #{i} in '{path}' is not an object.")
+        for key in ("image_dir", "output"):
+            if not catalog.get(key):
+                raise SystemExit(f"Catalog #{i} in '{path}' is missing \"{key}\".")
+        for key in CATALOG_KEYS:
+            if key in catalog and not isinstance(catalog[key], str):
+                raise SystemExit(f"Catalog #{i} in '{path}': \"{key}\" must be a string.")
+        if catalog["output"] in outputs:
+            raise SystemExit(f"Output '{catalog['output']}' is listed twice in '{path}'.")
+        outputs.add(catalog["output"])
+
+    return catalogs
+
+
+def build_catalog(catalog: dict, index: dict) -> tuple:
+    """
+    Build one rater page. Runs in a worker process for config builds.
+    """
+    output = catalog["output"]
+    brawlers = collect_brawlers(catalog["image_dir"], output, index)
+    count = generate_html(
+        brawlers,
+        output,
+        catalog.get("title", DEFAULT_TITLE),
+        catalog.get("storage_prefix", f"{DEFAULT_STORAGE_PREFIX}:{output}"),
+        catalog.get("metrics_endpoint"),
+        catalog.get("release"),
+    )
+    return output, count
+
+
+def index_for_dir(index: dict, image_dir: str) -> dict:
+    """
+    Return the index entries for images directly in image_dir.
+    """
+    prefix = f"{image_dir}/"
+    return {
+        path: meta
+        for path, meta in index.items()
+        if path.startswith(prefix) and "/" not in path[len(prefix):]
+    }
+
+
+def build_all(catalogs: list, jobs: Optional[int] = None):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
 
-    with open(OUTPUT_HTML, "w", encoding="utf-8") as f:
-        f.write(html)
+    index = load_image_index()
+    before = dict(index)
+    with span("refresh index"):
+        refresh_image_index(sorted({c["image_dir"] for c in catalogs}), index)
+    if index != before:
+        with span("save index"):
+            save_image_index(index)
 
+    # Spans inside worker processes are not collected; this one covers them.
+    with span("build catalogs"), ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Each worker only gets its own directory's slice of the index.
+        futures = {
+            pool.submit(build_catalog, c, index_for_dir(index, c["image_dir"])): c
+            for c in catalogs
+        }
+        for future in as_completed(futures):
+            catalog = futures[future]
+            output, count = future.result()
+            print(f"Wrote {output} ({count} images from '{catalog['image_dir']}').")
+
+
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main(argv: Optional[list] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Generate the Brawler Rater HTML page(s) from image folders."
+    )
+    parser.add_argument(
+        "--config",
+        help="JSON build config listing several catalogs to build in parallel",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        default=None,
+        help="worker processes for --config builds (default: CPU count)",
+    )
+    parser.add_argument(
+        "--metrics-endpoint",
+        metavar="URL",
+        help="URL the page POSTs its client-side performance summary to",
+    )
+    parser.add_argument(
+        "--release",
+        metavar="LABEL",
+        help="release label attached to reported performance metrics",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_session(args):
+        if args.config:
+            catalogs = load_build_config(args.config)
+            for catalog in catalogs:
+                if args.metrics_endpoint:
+                    catalog.setdefault("metrics_endpoint", args.metrics_endpoint)
+                if args.release:
+                    catalog.setdefault("release", args.release)
+            build_all(catalogs, args.jobs)
+            return
+
+        index = load_image_index()
+        before = dict(index)
+        count = generate_html(
+            collect_brawlers(IMAGE_DIR, OUTPUT_HTML, index),
+            metrics_endpoint=args.metrics_endpoint,
+            release=args.release,
+        )
+        if index != before:
+            with span("save index"):
+                save_image_index(index)
 
-def main():
-    brawlers = collect_brawlers()
-    print(f"Found {len(brawlers)} images in '{IMAGE_DIR}'.")
-    generate_html(brawlers)
-    print(f"Wrote {OUTPUT_HTML}. Open it in a browser to start rating.")
+        print(f"Found {count} images in '{IMAGE_DIR}'.")
+        print(f"Wrote {OUTPUT_HTML}. Open it in a browser to start rating.")
 
 
 if __name__ == "__main__":
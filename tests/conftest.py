@@ -0,0 +1,103 @@
+import pytest
+
+import download_brawler_images
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> dict:
+        return self._data
+
+
+class FakeMediaWiki:
+    """
+    Local stand-in for api.php, used in place of the requests.Session.
+
+    It implements just enough of action=query for the api backend:
+    list=categorymembers, prop=images and prop=imageinfo. Limits are
+    enforced like the real API: at most 50 titles per request, and
+    results are paged with "continue" (category_page members,
+    images_page image links per response).
+    """
+
+    MAX_TITLES = 50
+
+    def __init__(self, pages: dict, category_page: int = 50, images_page: int = 500):
+        # {page_title: [file_title, ...]} in page order; the API reports
+        # them alphabetically, as the real one does.
+        self.pages = pages
+        self.category_page = category_page
+        self.images_page = images_page
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        params = dict(params or {})
+        self.requests.append(params)
+
+        titles = params["titles"].split("|") if "titles" in params else []
+        if len(titles) > self.MAX_TITLES:
+            return FakeResponse({"error": {"code": "toomanyvalues", "info": "too many titles"}})
+
+        if params.get("list") == "categorymembers":
+            return FakeResponse(self._categorymembers(params))
+        if params.get("prop") == "images":
+            return FakeResponse(self._images(titles, params))
+        if params.get("prop") == "imageinfo":
+            return FakeResponse(self._imageinfo(titles))
+        return FakeResponse({"error": {"code": "badparams", "info": repr(params)}})
+
+    @staticmethod
+    def url_for(file_title: str) -> str:
+        name = file_title.split(":", 1)[1].replace(" ", "_")
+        return f"https://static.example/images/{name}"
+
+    def _categorymembers(self, params: dict) -> dict:
+        start = int(params.get("cmcontinue", 0))
+        titles = list(self.pages)
+        chunk = titles[start:start + self.category_page]
+        data = {"query": {"categorymembers": [{"ns": 0, "title": t} for t in chunk]}}
+        if start + self.category_page < len(titles):
+            data["continue"] = {"cmcontinue": str(start + self.category_page), "continue": "-||"}
+        return data
+
+    def _images(self, titles: list, params: dict) -> dict:
+        links = [
+            (title, file_title)
+            for title in titles
+            for file_title in sorted(self.pages.get(title, []))
+        ]
+        start = int(params.get("imcontinue", 0))
+        chunk = links[start:start + self.images_page]
+
+        pages = {title: {"title": title} for title in titles}
+        for title, file_title in chunk:
+            pages[title].setdefault("images", []).append({"ns": 6, "title": file_title})
+
+        data = {"query": {"pages": list(pages.values())}}
+        if start + self.images_page < len(links):
+            data["continue"] = {"imcontinue": str(start + self.images_page), "continue": "||"}
+        return data
+
+    def _imageinfo(self, titles: list) -> dict:
+        return {
+            "query": {
+                "pages": [
+                    {"title": t, "imageinfo": [{"url": self.url_for(t)}]} for t in titles
+                ]
+            }
+        }
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    def install(pages: dict, **kwargs) -> FakeMediaWiki:
+        api = FakeMediaWiki(pages, **kwargs)
+        monkeypatch.setattr(download_brawler_images, "_session", api)
+        return api
+
+    return install
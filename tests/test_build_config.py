@@ -0,0 +1,87 @@
+import json
+import struct
+
+import pytest
+
+import generate_brawler_rater
+from generate_brawler_rater import build_all, index_for_dir, load_build_config, main
+
+PNG = (
+    b"\x89PNG\r\n\x1a\n"
+    + struct.pack(">I", 13) + b"IHDR"
+    + struct.pack(">II", 64, 32)
+    + b"\x08\x06\x00\x00\x00"
+)
+
+
+def test_index_for_dir_only_returns_that_directory():
+    index = {
+        "a/x.png": {"bytes": 1},
+        "a/sub/y.png": {"bytes": 2},
+        "ab/z.png": {"bytes": 3},
+        "b/w.png": {"bytes": 4},
+    }
+    assert index_for_dir(index, "a") == {"a/x.png": {"bytes": 1}}
+
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "many"])
+def test_invalid_jobs_is_a_usage_error(jobs, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["--jobs", jobs])
+    assert exc.value.code == 2
+    assert "--jobs" in capsys.readouterr().err
+
+
+def test_build_all_writes_every_catalog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for image_dir, names in (("all", ["Colt", "Shelly"]), ("s1", ["Colt"])):
+        (tmp_path / image_dir).mkdir()
+        for name in names:
+            (tmp_path / image_dir / f"{name}_default.png").write_bytes(PNG)
+
+    (tmp_path / "build.json").write_text(json.dumps({"catalogs": [
+        {"image_dir": "all", "output": "out/all.html", "title": "All"},
+        {"image_dir": "s1", "output": "s1.html", "storage_prefix": "s1"},
+    ]}))
+
+    build_all(load_build_config("build.json"), jobs=2)
+
+    all_html = (tmp_path / "out" / "all.html").read_text()
+    assert "<title>All</title>" in all_html
+    assert '"file": "../all/Shelly_default.png"' in all_html
+    s1_html = (tmp_path / "s1.html").read_text()
+    assert 'STORAGE_PREFIX = "s1";' in s1_html
+    assert '"width": 64' in s1_html
+
+    index = json.loads((tmp_path / generate_brawler_rater.IMAGE_INDEX).read_text())
+    assert sorted(index) == ["all/Colt_default.png", "all/Shelly_default.png", "s1/Colt_default.png"]
+
+
+def write_config(tmp_path, text: str) -> str:
+    path = tmp_path / "build.json"
+    path.write_text(text)
+    return str(path)
+
+
+def test_missing_config_is_a_clean_error(tmp_path):
+    path = str(tmp_path / "nope.json")
+    with pytest.raises(SystemExit, match="Cannot read build config") as exc:
+        load_build_config(path)
+    assert path in str(exc.value)
+
+
+def test_malformed_config_is_a_clean_error(tmp_path):
+    path = write_config(tmp_path, '{"catalogs": [')
+    with pytest.raises(SystemExit, match="not valid JSON") as exc:
+        load_build_config(path)
+    assert path in str(exc.value)
+
+
+@pytest.mark.parametrize("key", ["title", "storage_prefix", "metrics_endpoint", "release", "output"])
+def test_non_string_values_are_rejected(tmp_path, key):
+    catalog = {"image_dir": "imgs", "output": "out.html", key: None}
+    if key == "output":
+        catalog[key] = 3
+    path = write_config(tmp_path, json.dumps({"catalogs": [catalog]}))
+    with pytest.raises(SystemExit, match=f'"{key}" must be a string'):
+        load_build_config(path)
@@ -0,0 +1,55 @@
+import pytest
+
+import brawler_rater
+import download_brawler_images
+import generate_brawler_rater
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    calls = []
+
+    def fake_main(argv=None, prog=None):
+        calls.append((argv, prog))
+
+    monkeypatch.setattr(generate_brawler_rater, "main", fake_main)
+    monkeypatch.setattr(download_brawler_images, "main", fake_main)
+    return calls
+
+
+def test_build_options_are_passed_through_unchanged(captured):
+    brawler_rater.main(["build", "--jobs", "2", "--release", "v1"])
+
+    assert captured == [(["--jobs", "2", "--release", "v1"], "brawler-rater build")]
+
+
+def test_scrape_help_is_passed_through(captured):
+    brawler_rater.main(["scrape", "-h"])
+
+    assert captured == [(["-h"], "brawler-rater scrape")]
+
+
+def test_scrape_help_is_the_sub_scripts_help(capsys):
+    with pytest.raises(SystemExit) as exc:
+        brawler_rater.main(["scrape", "-h"])
+
+    assert exc.value.code == 0
+    out = capsys.readouterr().out
+    assert out.startswith("usage: brawler-rater scrape")
+    assert "--backend" in out
+
+
+def test_build_errors_come_from_the_sub_scripts_parser(capsys):
+    with pytest.raises(SystemExit) as exc:
+        brawler_rater.main(["build", "--jobs", "0"])
+
+    assert exc.value.code == 2
+    assert "brawler-rater build: error: argument --jobs" in capsys.readouterr().err
+
+
+def test_serve_rejects_unknown_arguments(capsys):
+    with pytest.raises(SystemExit) as exc:
+        brawler_rater.main(["serve", "--bogus"])
+
+    assert exc.value.code == 2
+    assert "unrecognized arguments: --bogus" in capsys.readouterr().err
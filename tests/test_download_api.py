@@ -0,0 +1,88 @@
+import pytest
+
+from download_brawler_images import (
+    API_BATCH_SIZE,
+    get_default_skin_urls_api,
+    pick_default_skin_file,
+)
+
+
+def brawler_pages(count: int) -> dict:
+    # Every page also embeds a decoy that sorts before the page's own file.
+    return {
+        f"Brawler {i:03d}": [
+            f"File:Brawler {i:03d} Skin-Default.png",
+            "File:Aaa Skin-Default.png",
+            f"File:Brawler {i:03d} Portrait.png",
+        ]
+        for i in range(count)
+    }
+
+
+def test_each_brawler_resolves_to_its_own_file(fake_api):
+    api = fake_api(brawler_pages(120))
+
+    urls = get_default_skin_urls_api()
+
+    assert len(urls) == 120
+    for title, url in urls.items():
+        assert url == api.url_for(f"File:{title} Skin-Default.png")
+
+
+def test_titles_are_sent_in_batches_of_50(fake_api):
+    api = fake_api(brawler_pages(120))
+
+    get_default_skin_urls_api()
+
+    for prop in ("images", "imageinfo"):
+        sent = [r["titles"].split("|") for r in api.requests if r.get("prop") == prop]
+        assert all(len(titles) <= API_BATCH_SIZE for titles in sent)
+        assert [len(titles) for titles in sent] == [50, 50, 20]
+
+
+def test_category_continuation_is_followed(fake_api):
+    api = fake_api(brawler_pages(120), category_page=50)
+
+    urls = get_default_skin_urls_api()
+
+    members = [r for r in api.requests if r.get("list") == "categorymembers"]
+    assert len(members) == 3
+    assert len(urls) == 120
+
+
+def test_images_split_across_continuation(fake_api):
+    # Two image links per response: the decoy arrives before the page's own
+    # file, which only shows up in a later "continue" response.
+    api = fake_api(brawler_pages(3), images_page=2)
+
+    urls = get_default_skin_urls_api()
+
+    assert any("imcontinue" in r for r in api.requests)
+    assert urls == {
+        title: api.url_for(f"File:{title} Skin-Default.png") for title in brawler_pages(3)
+    }
+
+
+def test_pages_without_default_skin_are_skipped(fake_api):
+    fake_api({"Shelly": ["File:Shelly Skin-Default.png"], "Stub": ["File:Stub.png"]})
+
+    assert list(get_default_skin_urls_api()) == ["Shelly"]
+
+
+def test_api_error_is_raised(fake_api):
+    api = fake_api(brawler_pages(2))
+    api.MAX_TITLES = 1
+
+    with pytest.raises(RuntimeError, match="toomanyvalues"):
+        get_default_skin_urls_api()
+
+
+def test_pick_prefers_own_file_over_alphabetical_first():
+    files = ["File:Aaa Skin-Default.png", "File:El Primo Skin-Default.webp"]
+    assert pick_default_skin_file("El Primo", files) == "File:El Primo Skin-Default.webp"
+
+
+def test_pick_falls_back_to_any_default_skin():
+    files = ["File:Portrait.png", "File:Colt Skin-Default Old.png"]
+    assert pick_default_skin_file("Colt", files) == "File:Colt Skin-Default Old.png"
+    assert pick_default_skin_file("Colt", ["File:Portrait.png"]) is None
@@ -0,0 +1,88 @@
+import struct
+
+import pytest
+
+from generate_brawler_rater import collect_brawlers, read_image_header
+
+PNG = (
+    b"\x89PNG\r\n\x1a\n"
+    + struct.pack(">I", 13) + b"IHDR"
+    + struct.pack(">II", 640, 480)
+    + b"\x08\x06\x00\x00\x00"
+)
+GIF = b"GIF89a" + struct.pack("<HH", 33, 44) + b"\x00" * 3
+WEBP_VP8 = (
+    b"RIFF" + struct.pack("<I", 30) + b"WEBP"
+    + b"VP8 " + struct.pack("<I", 18)
+    + b"\x00\x00\x00" + b"\x9d\x01\x2a"
+    + struct.pack("<HH", 300 | 0x4000, 200)  # top bits carry the scale
+)
+WEBP_VP8L = (
+    b"RIFF" + struct.pack("<I", 30) + b"WEBP"
+    + b"VP8L" + struct.pack("<I", 10)
+    + b"\x2f" + struct.pack("<I", (268 - 1) | ((217 - 1) << 14))
+)
+WEBP_VP8X = (
+    b"RIFF" + struct.pack("<I", 30) + b"WEBP"
+    + b"VP8X" + struct.pack("<I", 10)
+    + b"\x00" * 4
+    + (1024 - 1).to_bytes(3, "little") + (768 - 1).to_bytes(3, "little")
+)
+JPEG = (
+    b"\xff\xd8"
+    + b"\xff\xe1" + struct.pack(">H", 1002) + b"\x00" * 1000  # EXIF, skipped
+    + b"\xff\xc2" + struct.pack(">H", 17) + b"\x08" + struct.pack(">HH", 120, 300)
+    + b"\x00" * 12
+)
+
+
+def write(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (PNG, {"format": "png", "width": 640, "height": 480}),
+        (GIF, {"format": "gif", "width": 33, "height": 44}),
+        (WEBP_VP8, {"format": "webp", "width": 300, "height": 200}),
+        (WEBP_VP8L, {"format": "webp", "width": 268, "height": 217}),
+        (WEBP_VP8X, {"format": "webp", "width": 1024, "height": 768}),
+        (JPEG, {"format": "jpeg", "width": 300, "height": 120}),
+    ],
+    ids=["png", "gif", "webp-vp8", "webp-vp8l", "webp-vp8x", "jpeg"],
+)
+def test_reads_dimensions_from_header(tmp_path, data, expected):
+    # Sniffed by content: the extension is deliberately wrong.
+    assert read_image_header(write(tmp_path, "img.png", data)) == expected
+
+
+@pytest.mark.parametrize(
+    "data",
+    [PNG, GIF, WEBP_VP8, WEBP_VP8L, WEBP_VP8X, JPEG],
+    ids=["png", "gif", "webp-vp8", "webp-vp8l", "webp-vp8x", "jpeg"],
+)
+def test_truncated_header_returns_none(tmp_path, data):
+    for size in range(len(data) - 1, 0, -1):
+        path = write(tmp_path, "img.png", data[:size])
+        result = read_image_header(path)
+        assert result is None or result == read_image_header(write(tmp_path, "full", data))
+
+
+def test_unknown_format_returns_none(tmp_path):
+    assert read_image_header(write(tmp_path, "img.png", b"not an image at all")) is None
+
+
+def test_truncated_image_does_not_break_collect(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "imgs").mkdir()
+    write(tmp_path / "imgs", "Shelly_default.png", PNG[:20])
+    write(tmp_path / "imgs", "Colt_default.png", PNG)
+
+    entries = list(collect_brawlers("imgs", "index.html", {}))
+
+    assert [e["name"] for e in entries] == ["Colt", "Shelly"]
+    assert entries[0]["width"] == 640
+    assert "width" not in entries[1]
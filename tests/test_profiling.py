@@ -0,0 +1,117 @@
+import argparse
+import pstats
+
+import pytest
+
+import brawler_profiling
+from brawler_profiling import PROFILER, Profiler, add_profile_arguments, profile_session
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(brawler_profiling.time, "perf_counter", fake)
+    return fake
+
+
+def parse(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def test_disabled_span_records_nothing():
+    profiler = Profiler()
+    with profiler.span("page"):
+        pass
+    assert profiler.stats == {}
+
+
+def test_nested_spans_are_keyed_by_stack(clock):
+    profiler = Profiler()
+    profiler.start()
+    for _ in range(2):
+        with profiler.span("page"):
+            clock.advance(1.0)
+            with profiler.span("fetch"):
+                clock.advance(2.0)
+            with profiler.span("parse"):
+                clock.advance(0.5)
+    with profiler.span("fetch"):
+        clock.advance(4.0)
+    profiler.stop()
+
+    assert profiler.stats == {
+        ("page",): [2, 7.0, 3.5],
+        ("page", "fetch"): [2, 4.0, 2.0],
+        ("page", "parse"): [2, 1.0, 0.5],
+        ("fetch",): [1, 4.0, 4.0],
+    }
+
+
+def test_self_times_subtract_direct_children(clock):
+    profiler = Profiler()
+    profiler.start()
+    with profiler.span("build"):
+        clock.advance(1.0)
+        with profiler.span("collect"):
+            clock.advance(2.0)
+            with profiler.span("read header"):
+                clock.advance(3.0)
+    profiler.stop()
+
+    assert profiler.self_times() == pytest.approx({
+        ("build",): 1.0,
+        ("build", "collect"): 2.0,
+        ("build", "collect", "read header"): 3.0,
+    })
+
+
+def test_write_collapsed_format_skips_zero_entries(clock, tmp_path):
+    profiler = Profiler()
+    profiler.start()
+    with profiler.span("page"):
+        # No self time: all of it is spent in the child.
+        with profiler.span("fetch"):
+            clock.advance(0.25)
+    with profiler.span("write"):
+        clock.advance(0.001)
+    profiler.stop()
+
+    path = tmp_path / "out.folded"
+    profiler.write_collapsed(str(path))
+
+    assert path.read_text() == "page;fetch 250000\nwrite 1000\n"
+
+
+def test_no_profile_options_leave_profiling_off():
+    with profile_session(parse([])):
+        assert not PROFILER.enabled
+
+
+@pytest.mark.parametrize("option", ["--profile-pstats", "--profile-collapsed"])
+def test_file_options_alone_enable_profiling(option, tmp_path, capsys):
+    path = tmp_path / "out"
+    with profile_session(parse([option, str(path)])):
+        assert PROFILER.enabled
+        with brawler_profiling.span("work"):
+            sum(range(1000))
+    assert not PROFILER.enabled
+    assert path.exists()
+    assert "work" in capsys.readouterr().out
+
+    if option == "--profile-pstats":
+        assert pstats.Stats(str(path)).total_calls > 0
+    else:
+        assert path.read_text().startswith("work ")
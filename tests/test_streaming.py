@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from generate_brawler_rater import generate_html, iter_json_array
+
+ENTRIES = [
+    {"name": "8-Bit", "file": "imgs/8-Bit_default.png", "width": 268, "height": 217},
+    {"name": "Rosa", "file": "imgs/Rosa_default.png"},
+    {"name": "Pépé", "file": "imgs/Pépé_default.png", "format": "webp"},
+    {"name": "李小龙 \"Bruce\"", "file": "imgs/Bruce_default.png", "bytes": 1234},
+]
+
+
+@pytest.mark.parametrize("count", [0, 1, len(ENTRIES)])
+def test_iter_json_array_matches_json_dumps(count):
+    items = ENTRIES[:count]
+    counter = [0]
+
+    streamed = "".join(iter_json_array(iter(items), counter))
+
+    assert streamed == json.dumps(items, ensure_ascii=False, indent=2)
+    assert counter[0] == count
+
+
+def test_generate_html_failure_keeps_existing_output(tmp_path):
+    output = tmp_path / "index.html"
+    output.write_text("previous page", encoding="utf-8")
+
+    def failing_entries():
+        yield ENTRIES[0]
+        raise SystemExit("No more images")
+
+    with pytest.raises(SystemExit, match="No more images"):
+        generate_html(failing_entries(), str(output))
+
+    assert output.read_text(encoding="utf-8") == "previous page"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index.html"]
+
+
+def test_generate_html_streams_entries(tmp_path):
+    output = tmp_path / "index.html"
+
+    count = generate_html(iter(ENTRIES), str(output))
+
+    assert count == len(ENTRIES)
+    html = output.read_text(encoding="utf-8")
+    assert json.dumps(ENTRIES, ensure_ascii=False, indent=2) in html
+    assert not (tmp_path / "index.html.tmp").exists()